@@ -0,0 +1,38 @@
+"""contact fulltext search
+
+Revision ID: 5d91aa40c8e3
+Revises: c4e8d15b0a27
+Create Date: 2024-12-02 13:21:09.446812
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5d91aa40c8e3'
+down_revision: Union[str, None] = 'c4e8d15b0a27'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Generated tsvector over the searchable text columns. Kept out of the
+    # ORM model on purpose: list queries project Contact.__table__.c and
+    # would otherwise drag the vector into every response row.
+    op.execute(
+        "ALTER TABLE contact ADD COLUMN search_tsv tsvector "
+        "GENERATED ALWAYS AS (to_tsvector('simple', "
+        "coalesce(first_name,'') || ' ' || coalesce(last_name,'') || ' ' || coalesce(email,''))"
+        ") STORED"
+    )
+    op.execute(
+        'CREATE INDEX ix_contact_search_tsv ON contact USING gin (search_tsv)'
+    )
+
+
+def downgrade() -> None:
+    op.execute('DROP INDEX ix_contact_search_tsv')
+    op.drop_column('contact', 'search_tsv')
@@ -0,0 +1,32 @@
+"""birthday month day index
+
+Revision ID: 9f2c3a1d7b56
+Revises: 76071fe84dce
+Create Date: 2024-12-02 11:38:54.217305
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9f2c3a1d7b56'
+down_revision: Union[str, None] = '76071fe84dce'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Functional index matching the (EXTRACT(MONTH), EXTRACT(DAY)) tuple
+    # predicate used by the upcoming-birthdays query.
+    op.create_index(
+        'ix_contact_birthday_month_day',
+        'contact',
+        [sa.text('EXTRACT(MONTH FROM birthday)'), sa.text('EXTRACT(DAY FROM birthday)')],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_contact_birthday_month_day', table_name='contact')
@@ -0,0 +1,44 @@
+"""contact search indexes
+
+Revision ID: c4e8d15b0a27
+Revises: 9f2c3a1d7b56
+Create Date: 2024-12-02 12:04:31.582146
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c4e8d15b0a27'
+down_revision: Union[str, None] = '9f2c3a1d7b56'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_contact_owner_id_id', 'contact', ['owner_id', 'id'])
+    # Trigram GIN indexes make the ILIKE '%...%' filters in search_contacts
+    # index-assisted instead of sequential scans.
+    op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    op.execute(
+        'CREATE INDEX ix_contact_first_name_trgm ON contact '
+        'USING gin (first_name gin_trgm_ops)'
+    )
+    op.execute(
+        'CREATE INDEX ix_contact_last_name_trgm ON contact '
+        'USING gin (last_name gin_trgm_ops)'
+    )
+    op.execute(
+        'CREATE INDEX ix_contact_email_trgm ON contact '
+        'USING gin (email gin_trgm_ops)'
+    )
+
+
+def downgrade() -> None:
+    op.execute('DROP INDEX ix_contact_email_trgm')
+    op.execute('DROP INDEX ix_contact_last_name_trgm')
+    op.execute('DROP INDEX ix_contact_first_name_trgm')
+    op.drop_index('ix_contact_owner_id_id', table_name='contact')
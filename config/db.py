@@ -3,9 +3,32 @@ from sqlalchemy.orm import DeclarativeBase, sessionmaker
 
 from config.general import settings
 
-engine = create_async_engine(settings.database_url, echo=True)
+engine = create_async_engine(
+    settings.database_url,
+    echo=True,
+    pool_size=settings.db_pool_size,
+    max_overflow=settings.db_max_overflow,
+    # pool_recycle already retires stale connections, so the per-checkout
+    # ping round trip of pool_pre_ping is not worth its cost here.
+    pool_recycle=settings.db_pool_recycle,
+    # LIFO checkout keeps a small hot set of connections (and their server
+    # state) warm instead of cycling through the whole pool.
+    pool_use_lifo=True,
+    # Roomy compiled-statement cache: the lambda-cached search variants and
+    # per-endpoint queries all stay compiled across requests.
+    query_cache_size=1200,
+    connect_args={
+        "prepared_statement_cache_size": settings.db_prepared_statement_cache_size,
+    },
+)
+# expire_on_commit=False keeps ORM attributes readable after commit without
+# an implicit refresh SELECT per attribute access.
 SessionLocal = sessionmaker(
-    autocommit=False, autoflush=False, bind=engine, class_=AsyncSession
+    autocommit=False,
+    autoflush=False,
+    bind=engine,
+    class_=AsyncSession,
+    expire_on_commit=False,
 )
 
 
@@ -4,6 +4,12 @@ from pydantic_settings import BaseSettings
 class Settings(BaseSettings):
     database_url: str
     database_test_url: str
+    # Engine pool sizing; defaults handle moderate concurrent bursts without
+    # queueing behind SQLAlchemy's stock 5+10 pool.
+    db_pool_size: int = 20
+    db_max_overflow: int = 40
+    db_pool_recycle: int = 1800
+    db_prepared_statement_cache_size: int = 1024
     secret_key: str
     algorithm: str
     access_token_expire_minutes: int
@@ -15,6 +21,9 @@ class Settings(BaseSettings):
     mail_port: int
     mail_server: str
     redis_url: str
+    # Shared secret for trusted internal callers; requests presenting it
+    # skip the Redis-backed rate limiter. Unset disables the bypass.
+    service_token: str | None = None
     cloudinary_name: str
     cloudinary_api_key: str
     cloudinary_api_secret: str
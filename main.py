@@ -23,9 +23,11 @@ Lifespan:
 """
 
 
+import asyncio
 from contextlib import asynccontextmanager
 
 from fastapi import FastAPI
+from fastapi.responses import ORJSONResponse
 from fastapi_cache import FastAPICache
 from fastapi_cache.backends.redis import RedisBackend
 from fastapi_limiter import FastAPILimiter
@@ -33,6 +35,7 @@ from fastapi.middleware.cors import CORSMiddleware
 from redis import asyncio as aioredis
 
 from config.general import settings
+from src.auth.mail_utils import mail_queue, send_verification_worker
 from src.contacts.routers import router as contacts_router
 from src.auth.routers import router as auth_router
 from src.users.routers import router as users_router
@@ -53,15 +56,28 @@ async def lifespan(app: FastAPI):
         None: Provides a context for the lifespan of the app.
     """
     # Startup event
-    redis = aioredis.from_url(settings.redis_url, encoding="utf-8")
+    # An explicit connection pool caps the number of Redis sockets under
+    # load; redis-py picks its C (hiredis) response parser automatically
+    # when the hiredis package is installed.
+    redis_pool = aioredis.ConnectionPool.from_url(
+        settings.redis_url, max_connections=50, encoding="utf-8"
+    )
+    redis = aioredis.Redis(connection_pool=redis_pool)
     await FastAPILimiter.init(redis)
     FastAPICache.init(RedisBackend(redis), prefix="fastapi-cache")
+    mail_worker_task = asyncio.create_task(send_verification_worker())
     yield
     # Shutdown event
+    await mail_queue.join()
+    mail_worker_task.cancel()
     await redis.close()
+    await redis_pool.disconnect()
 
 
-app = FastAPI(lifespan=lifespan)
+# ORJSONResponse serializes response bodies with orjson's Rust encoder,
+# which is several times faster than stdlib json for the list-heavy
+# payloads the contacts endpoints return.
+app = FastAPI(lifespan=lifespan, default_response_class=ORJSONResponse)
 
 
 origins = [ 
@@ -1,31 +1,37 @@
 """
 Mail Utility Module
 
-This module provides utility functions for sending emails, specifically for email verification in the authentication 
-process. It utilizes the FastAPI Mail library for configuring and sending emails.
+This module provides utilities for sending emails, specifically for email verification in the authentication
+process. Delivery runs over aiosmtplib so batched messages share one SMTP connection.
 
 Components:
-    - `mail_conf`: Configuration object for FastAPI Mail.
-    - `send_verification`: Function to send an email verification message.
+    - `mail_conf`: SMTP connection configuration.
+    - `mail_queue`: Application-wide queue of pending verification emails.
+    - `send_verification_worker`: Background task that drains the queue and
+      sends batched messages over a single SMTP connection.
 
 Dependencies:
-    - FastAPI Mail: A library for sending emails using SMTP.
+    - aiosmtplib: Asynchronous SMTP client used for delivery.
     - Settings: Application-specific configuration stored in `config.general`.
 
 Usage:
-    Call `send_verification` with an email address and an email body to send a verification email.
+    Put `(recipient, html_body)` tuples on `mail_queue`; the worker started
+    in the application lifespan delivers them in batches.
 
 Examples:
-    from src.auth.mail_utils import send_verification
+    from src.auth.mail_utils import mail_queue
 
-    await send_verification(
-        email="example@example.com",
-        email_body="<p>Verify your email by clicking the link.</p>"
+    await mail_queue.put(
+        ("example@example.com", "<p>Verify your email by clicking the link.</p>")
     )
 """
 
 
-from fastapi_mail import ConnectionConfig, MessageSchema, FastMail
+import asyncio
+from email.message import EmailMessage
+
+import aiosmtplib
+from fastapi_mail import ConnectionConfig
 
 from config.general import settings
 
@@ -58,25 +64,88 @@ mail_conf = ConnectionConfig(
     USE_CREDENTIALS=True,
 )
 
-async def send_verification(
-    email: str, 
-    email_body: str
-):
+"""
+Queue of pending verification emails.
+
+Routes enqueue `(recipient, html_body)` tuples instead of sending
+directly; a single background worker drains the queue so a burst of
+registrations shares one SMTP session instead of opening one per email.
+The maxsize bound keeps a registration burst from growing the queue
+without limit.
+"""
+mail_queue: asyncio.Queue = asyncio.Queue(maxsize=1000)
+
+MAIL_BATCH_SIZE = 50
+
+
+def _build_message(email: str, email_body: str) -> EmailMessage:
     """
-    Send a verification email to the specified recipient.
+    Build a MIME message for a verification email.
 
     Args:
         email (str): The recipient's email address.
         email_body (str): The body of the email, formatted as HTML.
 
-    Raises:
-        Exception: If there is an error in sending the email.
+    Returns:
+        EmailMessage: The message ready to be sent over SMTP.
     """
-    message = MessageSchema(
-        subject="Email verification",
-        recipients=[email],
-        body=email_body,
-        subtype="html",
+    message = EmailMessage()
+    message["Subject"] = "Email verification"
+    message["From"] = settings.mail_from
+    message["To"] = email
+    message.set_content(email_body, subtype="html")
+    return message
+
+
+async def _send_batch(batch: list[tuple[str, str]]):
+    """
+    Send a batch of verification emails over a single SMTP connection.
+
+    The batch is aborted early if more than a third of the messages fail,
+    since that usually means the SMTP server itself is unhealthy.
+
+    Args:
+        batch (list[tuple[str, str]]): `(recipient, html_body)` tuples.
+    """
+    smtp = aiosmtplib.SMTP(
+        hostname=settings.mail_server,
+        port=settings.mail_port,
+        use_tls=False,
+        start_tls=False,
     )
-    fm = FastMail(mail_conf)
-    await fm.send_message(message)
\ No newline at end of file
+    await smtp.connect()
+    try:
+        if mail_conf.USE_CREDENTIALS:
+            await smtp.login(settings.mail_username, settings.mail_password)
+        failed = 0
+        for email, email_body in batch:
+            try:
+                await smtp.send_message(_build_message(email, email_body))
+            except Exception as e:
+                print(f"Error sending verification email to {email}: {e}")
+                failed += 1
+                if failed * 3 > len(batch):
+                    break
+    finally:
+        await smtp.quit()
+
+
+async def send_verification_worker():
+    """
+    Background worker that drains `mail_queue` and sends emails.
+
+    Waits for the first queued message, then opportunistically grabs up to
+    `MAIL_BATCH_SIZE` more so a burst of registrations is delivered over
+    one SMTP handshake. Runs until cancelled (on application shutdown).
+    """
+    while True:
+        batch = [await mail_queue.get()]
+        while not mail_queue.empty() and len(batch) < MAIL_BATCH_SIZE:
+            batch.append(mail_queue.get_nowait())
+        try:
+            await _send_batch(batch)
+        except Exception as e:
+            print(f"Error sending verification email batch: {e}")
+        finally:
+            for _ in batch:
+                mail_queue.task_done()
\ No newline at end of file
@@ -7,7 +7,6 @@ This module contains two repository classes:
 
 Dependencies:
 - SQLAlchemy: Provides ORM capabilities for database interactions.
-- libgravatar: Used to fetch Gravatar images for user avatars.
 - Custom utilities for password hashing and schema definitions.
 
 Classes:
@@ -16,13 +15,15 @@ Classes:
 """
 
 
-from libgravatar import Gravatar
-from sqlalchemy import select
+import asyncio
+
+from sqlalchemy import case, insert, or_, select, update
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
 
 from src.auth.models import User, Role
 from src.auth.pass_utils import get_password_hash
-from src.auth.schema import UserCreate, RoleEnum
+from src.auth.schema import UserCreate, UserResponse, RoleEnum
 
 
 class UserRepository:
@@ -36,39 +37,69 @@ class UserRepository:
     def __init__(self, session: AsyncSession):
         self.session = session
 
+    @classmethod
+    def base_query(cls):
+        """
+        Base select for user reads, with the eager-load options every read
+        path needs in one place: the role is preloaded because RoleChecker
+        touches `user.role.name` on each protected request, which would
+        otherwise lazy-load per call.
+
+        Returns:
+            Select: A `select(User)` with eager-load options applied.
+        """
+        return select(User).options(selectinload(User.role))
+
     async def create_user(self, user_create: UserCreate):
         """
         Creates a new user in the database.
 
-        Hashes the user's password, fetches their Gravatar avatar, and assigns the default role.
+        Hashes the user's password, derives their Gravatar URL, and assigns the default role.
 
         Args:
             user_create (UserCreate): Schema containing the new user's details.
 
         Returns:
-            User: The newly created `User` object.
-        """
-        hashed_password = get_password_hash(user_create.password)
-        user_role = await RoleRepository(self.session).get_role_by_name(RoleEnum.USER)
-        avatar = None
-        try:
-            g = Gravatar(user_create.email)
-            avatar = g.get_image()
-        except Exception as e:
-            print(f"Error generating Gravatar: {e}")
-            avatar = "https://example.com/default_avatar.png"
-        new_user = User(
+            UserResponse: Response schema for the newly created user.
+        """
+        # Local import: utils imports UserRepository, so a top-level import
+        # would be circular.
+        from src.auth.utils import get_gravatar_url
+        # The role lookup (DB) and password hash (CPU, ~100ms bcrypt) are
+        # independent; run them concurrently so registration costs max() of
+        # the two instead of their sum. The avatar is a pure string
+        # computation — the old Gravatar.get_image() HTTP round-trip is gone.
+        role_id, hashed_password = await asyncio.gather(
+            RoleRepository(self.session).get_role_id(RoleEnum.USER),
+            asyncio.to_thread(get_password_hash, user_create.password),
+        )
+        avatar = get_gravatar_url(user_create.email)
+        # INSERT ... RETURNING id brings back the generated key in the same
+        # statement; every other column is already known, so the post-commit
+        # refresh SELECT is unnecessary.
+        stmt = (
+            insert(User)
+            .values(
+                username=user_create.username,
+                hashed_password=hashed_password,
+                email=user_create.email,
+                role_id=role_id,
+                avatar=avatar,
+                is_active=False,
+            )
+            .returning(User.id)
+        )
+        result = await self.session.execute(stmt)
+        user_id = result.scalar_one()
+        await self.session.commit()
+        # Every field the response needs is already known, so build the
+        # response schema directly instead of materializing an ORM instance.
+        return UserResponse(
+            id=user_id,
             username=user_create.username,
-            hashed_password=hashed_password,
             email=user_create.email,
-            role_id=user_role.id,
             avatar=avatar,
-            is_active=False,
         )
-        self.session.add(new_user)
-        await self.session.commit()
-        await self.session.refresh(new_user)
-        return new_user
     
     async def get_user_by_email(self, email):
         """
@@ -80,7 +111,7 @@ class UserRepository:
         Returns:
             User or None: The `User` object if found, otherwise `None`.
         """
-        query = select(User).where(User.email == email)
+        query = self.base_query().where(User.email == email)
         result = await self.session.execute(query)
         return result.scalar_one_or_none()
     
@@ -94,7 +125,7 @@ class UserRepository:
         Returns:
             User or None: The `User` object if found, otherwise `None`.
         """
-        query = select(User).where(User.username == username)
+        query = self.base_query().where(User.username == username)
         result = await self.session.execute(query)
         return result.scalar_one_or_none()
     
@@ -109,16 +140,29 @@ class UserRepository:
         Returns:
             User: The updated `User` object.
         """
+        # Local import: utils imports UserRepository, so a top-level import
+        # would be circular.
         from src.auth.utils import get_gravatar_url
-        user = await self.get_user_by_email(email)
-        if not user.avatar or user.avatar.startswith("https://www.gravatar.com"):
-            user.avatar = get_gravatar_url(email)
-        else:
-            user.avatar = url
-        self.session.add(user)
+        stmt = (
+            update(User)
+            .where(User.email == email)
+            .values(
+                avatar=case(
+                    (
+                        or_(
+                            User.avatar.is_(None),
+                            User.avatar.startswith("https://www.gravatar.com"),
+                        ),
+                        get_gravatar_url(email),
+                    ),
+                    else_=url,
+                )
+            )
+            .returning(User)
+        )
+        result = await self.session.execute(stmt)
         await self.session.commit()
-        await self.session.refresh(user)
-        return user
+        return result.scalar_one_or_none()
     
     async def activate_user(self, user: User):
         """
@@ -131,10 +175,18 @@ class UserRepository:
             None
         """
         user.is_active = True
-        await self.session.add(user)
+        # Session.add is synchronous; awaiting its None return raised a
+        # TypeError and made every /verify-email call fail and roll back.
+        self.session.add(user)
         await self.session.commit()
         await self.session.refresh(user)
 
+# Role rows are seeded by migration and never change at runtime, so their
+# ids can be cached for the lifetime of the process. Only the id is stored
+# (not the ORM instance) to avoid holding objects bound to a closed session.
+_role_id_cache: dict[RoleEnum, int] = {}
+
+
 class RoleRepository():
     """
     Repository class for managing `Role` data.
@@ -146,7 +198,26 @@ class RoleRepository():
     def __init__(self, session):
         self.session = session
 
-    
+    async def get_role_id(self, name: RoleEnum) -> int | None:
+        """
+        Retrieves a role id by name, served from the process-level cache
+        after the first lookup.
+
+        Args:
+            name (RoleEnum): The name of the role.
+
+        Returns:
+            int or None: The role id if the role exists, otherwise `None`.
+        """
+        role_id = _role_id_cache.get(name)
+        if role_id is not None:
+            return role_id
+        role = await self.get_role_by_name(name)
+        if role is None:
+            return None
+        _role_id_cache[name] = role.id
+        return role.id
+
     async def get_role_by_name(self, name: RoleEnum):
         """
         Retrieves a role by its name.
@@ -13,7 +13,9 @@ Routes:
 """
 
 
-from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, status
+import asyncio
+
+from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordRequestForm
 from fastapi_limiter.depends import RateLimiter
 from sqlalchemy.ext.asyncio import AsyncSession
@@ -21,20 +23,26 @@ from jinja2 import Environment, FileSystemLoader
 
 from config.db import get_db
 from src.auth.repos import UserRepository
-from src.auth.schema import UserCreate, UserResponse, Token
-from src.auth.mail_utils import send_verification
+from src.auth.schema import LoginRequest, UserCreate, UserResponse, Token
+from src.auth.mail_utils import mail_queue
 from src.auth.pass_utils import verify_password
 from src.auth.utils import (
-    create_access_token, 
-    create_refresh_token, 
+    create_access_token,
+    create_refresh_token,
     decode_access_token,
     create_verification_token,
     decode_verification_token,
+    get_cached_user_by_username,
+    invalidate_user_cache,
 )
 
 
 router = APIRouter()
 env = Environment(loader=FileSystemLoader("src/templates"))
+# Loaded once at import time; env.get_template() per request would re-stat
+# the template file on this hot path even though Jinja2 caches the compiled
+# template.
+email_template = env.get_template("email.html")
 
 
 @router.post(
@@ -45,17 +53,18 @@ env = Environment(loader=FileSystemLoader("src/templates"))
         dependencies=[Depends(RateLimiter(times=5, seconds=30))]
 )
 async def register(
-    user_create: UserCreate, 
-    background_tasks: BackgroundTasks,
+    user_create: UserCreate,
     db: AsyncSession = Depends(get_db),
 
 ):
     """
     Register a new user and send a verification email.
 
+    The email is enqueued on `mail_queue` and delivered by the background
+    mail worker, so a burst of registrations shares one SMTP session.
+
     Args:
         user_create (UserCreate): User creation data (email, username, password).
-        background_tasks (BackgroundTasks): Background task manager for sending emails.
         db (AsyncSession): Database session.
 
     Returns:
@@ -73,9 +82,8 @@ async def register(
     verification_link = (
         f"http://localhost:8000/auth/verify-email?token={verification_token}"
     )
-    template = env.get_template("email.html")
-    email_body = template.render(verification_link=verification_link)
-    background_tasks.add_task(send_verification, user.email, email_body)
+    email_body = email_template.render(verification_link=verification_link)
+    await mail_queue.put((user.email, email_body))
     return user
 
 
@@ -102,6 +110,7 @@ async def verify_email(token: str, db: AsyncSession = Depends(get_db)):
             status_code=status.HTTP_404_NOT_FOUND, detail="User not found"
         )
     await user_repo.activate_user(user)
+    await invalidate_user_cache(user.username)
     return {"msg": "Email verified successfully"}
 
 
@@ -112,6 +121,9 @@ async def login_for_access_token(
     """
     Authenticate a user and return access and refresh tokens.
 
+    Kept OAuth2-form-compatible for /docs and standard OAuth2 clients;
+    JSON clients should prefer `/token/json`, which skips form parsing.
+
     Args:
         form_data (OAuth2PasswordRequestForm): User credentials (username, password).
         db (AsyncSession): Database session.
@@ -122,15 +134,62 @@ async def login_for_access_token(
     Raises:
         HTTPException: If authentication fails (HTTP 401).
     """
-    user_repo = UserRepository(db)
-    user = await user_repo.get_user_by_username(form_data.username)
-    if not user or not verify_password(form_data.password, user.hashed_password):
+    return await _authenticate(form_data.username, form_data.password, db)
+
+
+@router.post("/token/json", response_model=Token)
+async def login_for_access_token_json(
+    credentials: LoginRequest, db: AsyncSession = Depends(get_db)
+):
+    """
+    Authenticate a user from a JSON body and return access and refresh tokens.
+
+    Accepts the credentials as a Pydantic model, so request parsing runs
+    through pydantic's compiled validator instead of the pure-Python
+    multipart form parser the OAuth2 route requires.
+
+    Args:
+        credentials (LoginRequest): User credentials (username, password).
+        db (AsyncSession): Database session.
+
+    Returns:
+        Token: Access and refresh tokens with token type.
+
+    Raises:
+        HTTPException: If authentication fails (HTTP 401).
+    """
+    return await _authenticate(credentials.username, credentials.password, db)
+
+
+async def _authenticate(username: str, password: str, db: AsyncSession) -> Token:
+    """
+    Verify credentials and issue access/refresh tokens.
+
+    Args:
+        username (str): The username to authenticate.
+        password (str): The plain-text password to verify.
+        db (AsyncSession): Database session.
+
+    Returns:
+        Token: Access and refresh tokens with token type.
+
+    Raises:
+        HTTPException: If authentication fails (HTTP 401).
+    """
+    user = await get_cached_user_by_username(username, db)
+    # bcrypt verification is CPU-bound (~100ms); run it in a worker thread
+    # so the event loop is not blocked during login bursts.
+    if not user or not await asyncio.to_thread(
+        verify_password, password, user.hashed_password
+    ):
         raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED, 
+            status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect username or password",
             headers={"WWW-Authenticate": "Bearer"},
         )
-    access_token = create_access_token(data={"sub": user.username})
+    # The role rides along as a claim so RoleChecker can gate requests
+    # without touching the database.
+    access_token = create_access_token(data={"sub": user.username, "role": user.role.name})
     refresh_token = create_refresh_token(data={"sub": user.username})
     return Token(access_token=access_token, refresh_token=refresh_token, token_type="bearer")
 
@@ -153,14 +212,13 @@ async def refresh_token(
         HTTPException: If the user does not exist (HTTP 401).
     """
     token_data = decode_access_token(refresh_token)
-    user_repo = UserRepository(db)
-    user = await user_repo.get_user_by_username(token_data.username)
+    user = await get_cached_user_by_username(token_data.username, db)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED, 
             detail="Incorrect username or password",
             headers={"WWW-Authenticate": "Bearer"},
         )
-    access_token = create_access_token(data={"sub": user.username})
+    access_token = create_access_token(data={"sub": user.username, "role": user.role.name})
     refresh_token = create_refresh_token(data={"sub": user.username})
     return Token(access_token=access_token, refresh_token=refresh_token, token_type="bearer")
\ No newline at end of file
@@ -24,11 +24,17 @@ class UserResponse(UserBase):
     id: int
 
     class Config:
-        from_atributes = True
+        from_attributes = True
+
+
+class LoginRequest(BaseModel):
+    username: str
+    password: str
 
 
 class TokenData(BaseModel):
     username: str | None = None
+    role: str | None = None
 
 
 class Token(BaseModel):
@@ -1,10 +1,13 @@
-from sqlalchemy import Integer, String, Date, ForeignKey
+from sqlalchemy import Index, Integer, String, Date, ForeignKey
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from config.db import Base
 
 class Contact(Base):
     __tablename__ = "contact"
+    # Every repo query filters on owner_id, usually together with id; the
+    # composite index lets those lookups resolve without touching the heap.
+    __table_args__ = (Index("ix_contact_owner_id_id", "owner_id", "id"),)
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
     first_name: Mapped[str] = mapped_column(String, index=True)
@@ -1,209 +1,361 @@
-"""
-Repository layer for managing database operations related to contacts.
-
-This module contains a single repository class, `ContactRepository`, which provides methods
-for CRUD operations, searching contacts, and retrieving contacts with upcoming birthdays.
-
-Dependencies:
-- SQLAlchemy: For ORM-based database operations.
-- datetime: To handle date and time calculations for birthdays.
-- Pydantic schemas for validating and passing contact data.
-
-Classes:
-    - ContactRepository
-"""
-
-
-from sqlalchemy import select
-
-from datetime import date, timedelta
-from typing import List, Dict
-
-from sqlalchemy.ext.asyncio import AsyncSession
-from src.contacts.models import Contact
-from src.contacts.schema import ContactCreate
-
-
-class ContactRepository:
-    """
-    Repository class for managing `Contact` data.
-
-    Args:
-        session (AsyncSession): SQLAlchemy asynchronous session for database operations.
-    """
-
-    def __init__(self, session: AsyncSession):
-        self.session = session
-
-
-    async def create_contact(self, contact: ContactCreate, owner_id: int) -> Contact:
-        """
-        Creates a new contact for a specific owner.
-
-        Args:
-            contact (ContactCreate): Schema containing the contact's details.
-            owner_id (int): ID of the owner associated with the contact.
-
-        Returns:
-            Contact: The newly created `Contact` object.
-        """
-        new_contact = Contact(**contact.model_dump(), owner_id=owner_id)
-        self.session.add(new_contact)
-        await self.session.commit()
-        await self.session.refresh(new_contact)
-        return new_contact
-
-
-    async def get_contact(self, contact_id: int, owner_id: int) -> Contact:
-        """
-        Retrieves a contact by its ID and owner ID.
-
-        Args:
-            contact_id (int): ID of the contact to retrieve.
-            owner_id (int): ID of the owner associated with the contact.
-
-        Returns:
-            Contact or None: The `Contact` object if found, otherwise `None`.
-        """
-        query = select(Contact).where(Contact.id == contact_id).where(Contact.owner_id == owner_id)
-        result = await self.session.execute(query)
-        return result.scalar_one_or_none()
-    
-
-    async def get_all_contacts(self, owner_id) -> list[Contact]:
-        """
-        Retrieves all contacts associated with a specific owner.
-
-        Args:
-            owner_id (int): ID of the owner.
-
-        Returns:
-            list[Contact]: A list of all `Contact` objects for the owner.
-        """
-        query = select(Contact).where(Contact.owner_id == owner_id)
-        result = await self.session.execute(query)
-        return result.scalars().all()
-    
-
-    async def update_contact(
-        self, 
-        contact_id: int, 
-        contact_data: ContactCreate, 
-        owner_id: int
-    ) -> Contact:
-        """
-        Updates a contact's details.
-
-        Args:
-            contact_id (int): ID of the contact to update.
-            contact_data (ContactCreate): Schema containing updated contact details.
-            owner_id (int): ID of the owner associated with the contact.
-
-        Returns:
-            Contact or None: The updated `Contact` object if found, otherwise `None`.
-        """
-        query = select(Contact).where(Contact.id == contact_id).where(Contact.owner_id == owner_id)
-        result = await self.session.execute(query)
-        contact = result.scalar_one_or_none()
-        if contact:
-            for key, value in contact_data.model_dump().items():
-                setattr(contact, key, value)
-            await self.session.commit()
-            await self.session.refresh(contact)
-        return contact
-    
-
-    async def delete_contact(self, contact_id: int, owner_id: int) -> bool:
-        """
-        Deletes a contact by its ID and owner ID.
-
-        Args:
-            contact_id (int): ID of the contact to delete.
-            owner_id (int): ID of the owner associated with the contact.
-
-        Returns:
-            bool: `True` if the contact was deleted, otherwise `False`.
-        """
-        contact = await self.get_contact(contact_id, owner_id=owner_id)
-        if contact:
-            await self.session.delete(contact)
-            await self.session.commit()
-            return True
-        return False
-
-
-    async def search_contacts(
-        self, 
-        owner_id: int,
-        first_name: str = None, 
-        last_name: str = None, 
-        email: str = None
-    ) -> List[Contact]:
-        """
-        Searches for contacts based on optional filters.
-
-        Args:
-            owner_id (int): ID of the owner.
-            first_name (str, optional): Filter by first name (case-insensitive partial match).
-            last_name (str, optional): Filter by last name (case-insensitive partial match).
-            email (str, optional): Filter by email (case-insensitive partial match).
-
-        Returns:
-            List[Contact]: A list of matching `Contact` objects.
-        """
-        query = select(Contact).where(Contact.owner_id == owner_id)
-        if first_name:
-            query = query.filter(Contact.first_name.ilike(f"%{first_name}%"))
-        if last_name:
-            query = query.filter(Contact.last_name.ilike(f"%{last_name}%"))
-        if email:
-            query = query.filter(Contact.email.ilike(f"%{email}%"))
-        result = await self.session.execute(query)
-        return result.scalars().all()
-    
-
-    async def get_upcoming_birthdays(self, owner_id: int) -> List[Dict]:
-        """
-        Retrieves contacts with upcoming birthdays within the next 7 days.
-
-        Args:
-            owner_id (int): ID of the owner.
-
-        Returns:
-            List[Dict]: A list of dictionaries with contact details and adjusted birthday dates.
-        """
-        upcoming_birthdays = []
-        today = date.today()
-        query = (
-            select(Contact)
-            .where(Contact.owner_id == owner_id)
-            .where(Contact.birthday.isnot(None))
-        )
-        result = await self.session.execute(query)
-        async for contact in result.scalars():
-            if contact.birthday:
-                birthday = contact.birthday
-
-            birthday_this_year = birthday.replace(year=today.year)
-
-            if birthday_this_year < today:
-                birthday_this_year = birthday_this_year.replace(year=today.year + 1)
-
-            if today <= birthday_this_year <= today + timedelta(days=7):
-                birthday_dict = {
-                    "id": contact.id,
-                    "first_name": contact.first_name,
-                    "last_name": contact.last_name,
-                    "email": contact.email or None,
-                    "phone_number": contact.phone_number or None,
-                    "birthday": birthday_this_year,
-                    "additional_info": contact.additional_info or None,
-                }
-
-                if birthday_this_year.weekday() >= 5:
-                    next_monday = birthday_this_year + timedelta(days=(7 - birthday_this_year.weekday()))
-                    birthday_dict["birthday"] = next_monday
-
-                upcoming_birthdays.append(birthday_dict)
-
-        return upcoming_birthdays
+"""
+Repository layer for managing database operations related to contacts.
+
+This module contains a single repository class, `ContactRepository`, which provides methods
+for CRUD operations, searching contacts, and retrieving contacts with upcoming birthdays.
+
+Dependencies:
+- SQLAlchemy: For ORM-based database operations.
+- datetime: To handle date and time calculations for birthdays.
+- Pydantic schemas for validating and passing contact data.
+
+Classes:
+    - ContactRepository
+"""
+
+
+from sqlalchemy import bindparam, delete, extract, insert, lambda_stmt, select, text, tuple_, update
+
+from datetime import date, timedelta
+from typing import List, Dict
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from src.contacts.models import Contact
+from src.contacts.schema import ContactCreate
+
+
+# Hottest statement in the module (every GET /contacts/{id}). Built once at
+# import; each call only binds parameters, and the engine's compiled-query
+# and prepared-statement caches keep it prepared server-side.
+_GET_CONTACT_QUERY = (
+    select(Contact)
+    .where(Contact.id == bindparam("contact_id"))
+    .where(Contact.owner_id == bindparam("owner_id"))
+)
+
+
+class ContactRepository:
+    """
+    Repository class for managing `Contact` data.
+
+    Args:
+        session (AsyncSession): SQLAlchemy asynchronous session for database operations.
+    """
+
+    # Shared base for the Core-row read paths, built once per process.
+    # Composing `.where()` on the same base object keeps the statements
+    # structurally identical across calls, so SQLAlchemy's compiled-query
+    # cache hits reliably instead of depending on per-call reconstruction
+    # producing an equivalent tree.
+    _BASE_SELECT = select(*Contact.__table__.c)
+
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+
+    async def create_contact(self, contact: ContactCreate, owner_id: int) -> Contact:
+        """
+        Creates a new contact for a specific owner.
+
+        Args:
+            contact (ContactCreate): Schema containing the contact's details.
+            owner_id (int): ID of the owner associated with the contact.
+
+        Returns:
+            Contact: The newly created `Contact` object.
+        """
+        # INSERT ... RETURNING populates the generated id in the same round
+        # trip; with expire_on_commit=False there is no refresh SELECT after
+        # the commit either.
+        # dict(contact) walks pydantic's field iterator in C, without the
+        # copy/conversion pass model_dump() performs.
+        query = (
+            insert(Contact)
+            .values(**dict(contact), owner_id=owner_id)
+            .returning(Contact)
+        )
+        result = await self.session.execute(query)
+        new_contact = result.scalar_one()
+        await self.session.commit()
+        return new_contact
+
+
+    async def create_contacts_bulk(
+        self, contacts: List[ContactCreate], owner_id: int
+    ) -> List[Contact]:
+        """
+        Creates several contacts for a specific owner in one statement.
+
+        A single multi-row INSERT ... RETURNING replaces N per-row
+        add/commit cycles, so a bulk import costs one round trip and one
+        commit regardless of batch size.
+
+        Args:
+            contacts (List[ContactCreate]): Schemas with the contacts' details.
+            owner_id (int): ID of the owner associated with the contacts.
+
+        Returns:
+            List[Contact]: The newly created `Contact` objects.
+        """
+        query = (
+            insert(Contact)
+            .values([{**c.model_dump(), "owner_id": owner_id} for c in contacts])
+            .returning(Contact)
+        )
+        result = await self.session.execute(query)
+        created = result.scalars().all()
+        await self.session.commit()
+        return created
+
+
+    async def get_contact(self, contact_id: int, owner_id: int) -> Contact:
+        """
+        Retrieves a contact by its ID and owner ID.
+
+        Args:
+            contact_id (int): ID of the contact to retrieve.
+            owner_id (int): ID of the owner associated with the contact.
+
+        Returns:
+            Contact or None: The `Contact` object if found, otherwise `None`.
+        """
+        result = await self.session.execute(
+            _GET_CONTACT_QUERY, {"contact_id": contact_id, "owner_id": owner_id}
+        )
+        return result.scalar_one_or_none()
+    
+
+    async def get_all_contacts(
+        self, owner_id, limit: int = 50, after_id: int | None = None
+    ) -> List[Dict]:
+        """
+        Retrieves a page of contacts associated with a specific owner.
+
+        Pagination is keyset-based (`WHERE id > after_id ORDER BY id LIMIT
+        n`): the (owner_id, id) index serves every page at the same cost,
+        unlike OFFSET which re-scans skipped rows. Clients pass the last
+        id of the previous page as `after_id` to fetch the next one.
+
+        Rows come back as Core mappings rather than ORM instances: the
+        response model validates them directly, so no identity-map or
+        instrumentation work happens per row.
+
+        Args:
+            owner_id (int): ID of the owner.
+            limit (int): Maximum number of contacts to return.
+            after_id (int, optional): Return only contacts with an id
+                greater than this cursor.
+
+        Returns:
+            List[Dict]: Mappings with the contacts' column values.
+        """
+        query = self._BASE_SELECT.where(Contact.owner_id == owner_id)
+        if after_id is not None:
+            query = query.where(Contact.id > after_id)
+        query = query.order_by(Contact.id).limit(limit)
+        # stream() fetches through a server-side cursor, so rows arrive in
+        # driver-sized batches rather than one fetchall; the page itself is
+        # already bounded by `limit`, and the route's cache needs a concrete
+        # list, so the rows are still collected before returning.
+        result = await self.session.stream(query)
+        return [row async for row in result.mappings()]
+    
+
+    async def iter_all_contacts(self):
+        """
+        Streams every contact in the system as Core row mappings.
+
+        Uses a server-side cursor (`session.stream`), so rows are fetched
+        in batches as the consumer iterates instead of materializing the
+        whole table in memory first. The session must stay open while the
+        returned iterator is consumed.
+
+        Returns:
+            AsyncMappingResult: Async iterator over the contacts' rows.
+        """
+        query = self._BASE_SELECT.order_by(Contact.id)
+        result = await self.session.stream(query)
+        return result.mappings()
+
+
+    async def update_contact(
+        self, 
+        contact_id: int, 
+        contact_data: ContactCreate, 
+        owner_id: int
+    ) -> Contact:
+        """
+        Updates a contact's details.
+
+        Args:
+            contact_id (int): ID of the contact to update.
+            contact_data (ContactCreate): Schema containing updated contact details.
+            owner_id (int): ID of the owner associated with the contact.
+
+        Returns:
+            Contact or None: The updated `Contact` object if found, otherwise `None`.
+        """
+        # Only columns the client actually sent go into the UPDATE; a
+        # payload with no set fields skips the write entirely.
+        values = contact_data.model_dump(exclude_unset=True)
+        if not values:
+            return await self.get_contact(contact_id, owner_id)
+        # Single UPDATE ... RETURNING instead of SELECT, per-attribute
+        # setattr and a refresh SELECT: one round trip, one row lock.
+        query = (
+            update(Contact)
+            .where(Contact.id == contact_id)
+            .where(Contact.owner_id == owner_id)
+            .values(**values)
+            .returning(Contact)
+        )
+        result = await self.session.execute(query)
+        await self.session.commit()
+        return result.scalar_one_or_none()
+    
+
+    async def delete_contact(self, contact_id: int, owner_id: int) -> bool:
+        """
+        Deletes a contact by its ID and owner ID.
+
+        Args:
+            contact_id (int): ID of the contact to delete.
+            owner_id (int): ID of the owner associated with the contact.
+
+        Returns:
+            bool: `True` if the contact was deleted, otherwise `False`.
+        """
+        # One DELETE round trip; the previous SELECT-then-session.delete
+        # dance fetched the row into the identity map just to remove it.
+        # RETURNING id reports whether a row was hit explicitly, rather
+        # than leaning on driver rowcount semantics.
+        query = (
+            delete(Contact)
+            .where(Contact.id == contact_id)
+            .where(Contact.owner_id == owner_id)
+            .returning(Contact.id)
+        )
+        result = await self.session.execute(query)
+        await self.session.commit()
+        return result.scalar_one_or_none() is not None
+
+
+    async def search_contacts(
+        self,
+        owner_id: int,
+        first_name: str = None,
+        last_name: str = None,
+        email: str = None,
+        q: str = None,
+    ) -> List[Dict]:
+        """
+        Searches for contacts based on optional filters.
+
+        When `q` is given, the search runs against the generated
+        `search_tsv` tsvector column with websearch_to_tsquery, served by
+        its GIN index; the per-field ILIKE filters (backed by the trigram
+        indexes) remain for field-scoped or short-prefix lookups.
+
+        Args:
+            owner_id (int): ID of the owner.
+            first_name (str, optional): Filter by first name (case-insensitive partial match).
+            last_name (str, optional): Filter by last name (case-insensitive partial match).
+            email (str, optional): Filter by email (case-insensitive partial match).
+            q (str, optional): Full-text query across name and email.
+
+        Returns:
+            List[Dict]: Mappings with the matching contacts' column values.
+        """
+        if q:
+            query = (
+                self._BASE_SELECT
+                .where(Contact.owner_id == owner_id)
+                .where(text("search_tsv @@ websearch_to_tsquery('simple', :q)"))
+            )
+            result = await self.session.execute(query, {"q": q})
+            return result.mappings().all()
+        # lambda_stmt caches the compiled SQL per combination of filters, so
+        # repeated searches skip statement compilation; the closure variables
+        # become ordinary bound parameters.
+        query = lambda_stmt(
+            lambda: select(*Contact.__table__.c).where(Contact.owner_id == owner_id)
+        )
+        if first_name:
+            first_name = f"%{first_name}%"
+            query += lambda s: s.where(Contact.first_name.ilike(first_name))
+        if last_name:
+            last_name = f"%{last_name}%"
+            query += lambda s: s.where(Contact.last_name.ilike(last_name))
+        if email:
+            email = f"%{email}%"
+            query += lambda s: s.where(Contact.email.ilike(email))
+        result = await self.session.execute(query)
+        return result.mappings().all()
+    
+
+    async def get_upcoming_birthdays(self, owner_id: int) -> List[Dict]:
+        """
+        Retrieves contacts with upcoming birthdays within the next 7 days.
+
+        Args:
+            owner_id (int): ID of the owner.
+
+        Returns:
+            List[Dict]: A list of dictionaries with contact details and adjusted birthday dates.
+        """
+        upcoming_birthdays = []
+        today = date.today()
+        # Filter in SQL on the (month, day) of the birthday instead of
+        # scanning every contact and re-anchoring each date in Python:
+        # only the rows inside the 7-day window are transferred, and the
+        # tuple predicate can be served by the functional index on
+        # (EXTRACT(MONTH ...), EXTRACT(DAY ...)).
+        window_dates = [today + timedelta(days=offset) for offset in range(8)]
+        window = [(d.month, d.day) for d in window_dates]
+        # Weekend birthdays are celebrated the following Monday. There are
+        # only 8 candidate dates, so the shift is computed once up front and
+        # the loop below does a single dict lookup per row.
+        shift = {
+            d: d + timedelta(days=7 - d.weekday()) if d.weekday() >= 5 else d
+            for d in window_dates
+        }
+        # Project only the columns the response needs and stream the rows:
+        # no ORM instances are materialized and rows are consumed as they
+        # arrive instead of being buffered first.
+        query = (
+            select(
+                Contact.id,
+                Contact.first_name,
+                Contact.last_name,
+                Contact.email,
+                Contact.phone_number,
+                Contact.birthday,
+                Contact.additional_info,
+            )
+            .where(Contact.owner_id == owner_id)
+            .where(Contact.birthday.isnot(None))
+            .where(
+                tuple_(
+                    extract("month", Contact.birthday),
+                    extract("day", Contact.birthday),
+                ).in_(window)
+            )
+        )
+        result = await self.session.stream(query)
+        async for row in result.mappings():
+            birthday_this_year = row["birthday"].replace(year=today.year)
+            if birthday_this_year < today:
+                birthday_this_year = birthday_this_year.replace(year=today.year + 1)
+
+            birthday_dict = {
+                "id": row["id"],
+                "first_name": row["first_name"],
+                "last_name": row["last_name"],
+                "email": row["email"] or None,
+                "phone_number": row["phone_number"] or None,
+                "birthday": shift.get(birthday_this_year, birthday_this_year),
+                "additional_info": row["additional_info"] or None,
+            }
+            upcoming_birthdays.append(birthday_dict)
+
+        return upcoming_birthdays
@@ -14,11 +14,19 @@ Routes:
 """
 
 
+import asyncio
+
 from fastapi import APIRouter, Query, Depends, HTTPException, status
+import orjson
+from fastapi.responses import ORJSONResponse, StreamingResponse
+from fastapi_cache import FastAPICache
+from fastapi_cache.coder import PickleCoder
+from fastapi_cache.decorator import cache
 from sqlalchemy.ext.asyncio import AsyncSession
 from fastapi_limiter.depends import RateLimiter
+from pydantic import TypeAdapter
 
-from config.db import get_db
+from config.db import SessionLocal, get_db
 from src.contacts.schema import ContactCreate, ContactResponse, ContactUpdate
 from src.contacts.repos import ContactRepository
 from src.auth.models import User
@@ -28,10 +36,49 @@ from src.auth.schema import RoleEnum
 
 router = APIRouter()
 
+# Short TTL: read endpoints are hit far more often than contacts change,
+# and every write path below clears the owner's namespace anyway.
+CONTACTS_CACHE_NAMESPACE = "contacts"
+CONTACTS_CACHE_TTL_SECONDS = 30
+
+# Validates and dumps a whole contact list in one C-level pass, instead of
+# FastAPI's per-row response_model processing.
+CONTACT_LIST_ADAPTER = TypeAdapter(list[ContactResponse])
+
+
+def contacts_cache_key(func, namespace, *, request=None, response=None, args=(), kwargs=None):
+    """
+    Build a per-user cache key (`<namespace>:<user_id>:<endpoint>[:<contact_id>]`)
+    so one owner's entries can be invalidated without touching other users.
+    """
+    kwargs = kwargs or {}
+    user = kwargs["user"]
+    key = f"{namespace}:{user.id}:{func.__name__}"
+    contact_id = kwargs.get("contact_id")
+    if contact_id is not None:
+        key = f"{key}:{contact_id}"
+    limit = kwargs.get("limit")
+    if limit is not None:
+        key = f"{key}:{limit}:{kwargs.get('after_id')}"
+    return key
+
+
+async def invalidate_contacts_cache(user_id: int):
+    """
+    Drop all cached contact reads for one owner after a write, so the next
+    read reflects the change instead of a stale cache entry.
+    """
+    try:
+        backend = FastAPICache.get_backend()
+        prefix = FastAPICache.get_prefix()
+    except AssertionError:
+        # Caching not initialized (e.g. unit tests outside the lifespan).
+        return
+    await backend.clear(namespace=f"{prefix}:{CONTACTS_CACHE_NAMESPACE}:{user_id}")
+
 
 @router.get(
-        "/search", 
-        response_model=list[ContactResponse], 
+        "/search",
         description='No more than 5 requests per 30 seconds',
         dependencies=[Depends(RateLimiter(times=5, seconds=30))]
 )
@@ -39,6 +86,7 @@ async def search_contacts(
     first_name: str = Query(None, alias="first_name"),
     last_name: str = Query(None),
     email: str = Query(None),
+    q: str = Query(None, description="Full-text search across name and email"),
     user: User = Depends(RoleChecker([RoleEnum.USER])),
     db: AsyncSession = Depends(get_db)
 ):
@@ -49,6 +97,7 @@ async def search_contacts(
         first_name (str, optional): The first name to search for.
         last_name (str, optional): The last name to search for.
         email (str, optional): The email to search for.
+        q (str, optional): Full-text query across name and email.
         user (User): The current authenticated user.
         db (AsyncSession): Database session dependency.
 
@@ -58,16 +107,20 @@ async def search_contacts(
     Raises:
         HTTPException: If no search parameters are provided.
     """
-    if not first_name and not last_name and not email:
+    if not first_name and not last_name and not email and not q:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="At least one search parameter is required")
     contact_repo = ContactRepository(db)
     contacts = await contact_repo.search_contacts(
         user.id,
-        first_name=first_name, 
-        last_name=last_name, 
-        email=email
+        first_name=first_name,
+        last_name=last_name,
+        email=email,
+        q=q
     )
-    return contacts
+    data = CONTACT_LIST_ADAPTER.dump_python(
+        CONTACT_LIST_ADAPTER.validate_python(contacts), mode="json"
+    )
+    return ORJSONResponse(data)
 
 
 @router.get(
@@ -76,6 +129,12 @@ async def search_contacts(
         dependencies=[Depends(RateLimiter(times=5, seconds=30))],
         response_model=list[ContactResponse]
 )
+@cache(
+    expire=CONTACTS_CACHE_TTL_SECONDS,
+    namespace=CONTACTS_CACHE_NAMESPACE,
+    coder=PickleCoder,
+    key_builder=contacts_cache_key,
+)
 async def upcoming_birthdays(
     user: User = Depends(RoleChecker([RoleEnum.USER, RoleEnum.ADMIN])),
     db: AsyncSession = Depends(get_db)
@@ -104,8 +163,45 @@ async def upcoming_birthdays(
     return contacts
 
 
-@router.post("/", 
-            response_model=ContactResponse, 
+@router.get(
+        "/dashboard",
+        description='No more than 5 requests per 30 seconds',
+        dependencies=[Depends(RateLimiter(times=5, seconds=30))],
+)
+async def contacts_dashboard(
+    user: User = Depends(RoleChecker([RoleEnum.USER, RoleEnum.ADMIN])),
+):
+    """
+    Retrieve the first page of contacts and the upcoming birthdays in one
+    response.
+
+    The two queries are independent, so they run concurrently via
+    asyncio.gather — each on its own session, since an AsyncSession must
+    not be shared between concurrent tasks.
+
+    Args:
+        user (User): The current authenticated user.
+
+    Returns:
+        dict: `contacts` (first page) and `upcoming_birthdays`.
+    """
+    async with SessionLocal() as contacts_session, SessionLocal() as birthdays_session:
+        contacts, birthdays = await asyncio.gather(
+            ContactRepository(contacts_session).get_all_contacts(user.id),
+            ContactRepository(birthdays_session).get_upcoming_birthdays(user.id),
+        )
+    return {
+        "contacts": CONTACT_LIST_ADAPTER.dump_python(
+            CONTACT_LIST_ADAPTER.validate_python(contacts), mode="json"
+        ),
+        "upcoming_birthdays": CONTACT_LIST_ADAPTER.dump_python(
+            CONTACT_LIST_ADAPTER.validate_python(birthdays), mode="json"
+        ),
+    }
+
+
+@router.post("/",
+            response_model=ContactResponse,
             status_code=status.HTTP_201_CREATED,
             description='No more than 5 requests per 30 seconds',
             dependencies=[Depends(RateLimiter(times=5, seconds=30))]
@@ -127,8 +223,57 @@ async def create_contact(
         ContactResponse: The created contact.
     """
     contact_repo = ContactRepository(db)
-    return await contact_repo.create_contact(contact, user.id)
-     
+    created = await contact_repo.create_contact(contact, user.id)
+    await invalidate_contacts_cache(user.id)
+    return created
+
+
+MAX_BULK_CONTACTS = 500
+
+
+@router.post("/bulk",
+            response_model=list[ContactResponse],
+            status_code=status.HTTP_201_CREATED,
+            description='No more than 5 requests per 30 seconds',
+            dependencies=[Depends(RateLimiter(times=5, seconds=30))]
+)
+async def create_contacts_bulk(
+    contacts: list[ContactCreate],
+    user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Create several contacts in one request.
+
+    The whole batch is inserted with a single multi-row INSERT, so
+    importing N contacts costs one round trip instead of N calls.
+
+    Args:
+        contacts (list[ContactCreate]): The contacts to create (at most 500).
+        user (User): The current authenticated user.
+        db (AsyncSession): Database session dependency.
+
+    Returns:
+        list[ContactResponse]: The created contacts.
+
+    Raises:
+        HTTPException: If the batch is empty or exceeds the size limit.
+    """
+    if not contacts:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail="No contacts provided"
+        )
+    if len(contacts) > MAX_BULK_CONTACTS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"At most {MAX_BULK_CONTACTS} contacts per request",
+        )
+    contact_repo = ContactRepository(db)
+    created = await contact_repo.create_contacts_bulk(contacts, user.id)
+    await invalidate_contacts_cache(user.id)
+    return created
+
+
 
 @router.get(
         "/{contact_id}", 
@@ -136,6 +281,12 @@ async def create_contact(
         dependencies=[Depends(RateLimiter(times=5, seconds=30))],
         response_model=ContactResponse
 )
+@cache(
+    expire=CONTACTS_CACHE_TTL_SECONDS,
+    namespace=CONTACTS_CACHE_NAMESPACE,
+    coder=PickleCoder,
+    key_builder=contacts_cache_key,
+)
 async def get_contact(
     contact_id: int, 
     user: User = Depends(RoleChecker([RoleEnum.USER, RoleEnum.ADMIN])),
@@ -163,54 +314,85 @@ async def get_contact(
 
 
 @router.get(
-        "/", 
-        response_model=list[ContactResponse], 
+        "/",
         description='No more than 5 requests per 30 seconds',
         dependencies=[Depends(RateLimiter(times=5, seconds=30))],
 )
+@cache(
+    expire=CONTACTS_CACHE_TTL_SECONDS,
+    namespace=CONTACTS_CACHE_NAMESPACE,
+    coder=PickleCoder,
+    key_builder=contacts_cache_key,
+)
 async def get_all_contacts(
+    limit: int = Query(50, ge=1, le=500),
+    after_id: int | None = Query(None),
     user: User = Depends(RoleChecker([RoleEnum.ADMIN, RoleEnum.USER])),
     # user: User = Depends(get_current_user),
     db: AsyncSession = Depends(get_db)
 ):
     """
-    Retrieve all contacts for the current user.
+    Retrieve a page of contacts for the current user.
+
+    Keyset-paginated: pass the id of the last contact from the previous
+    page as `after_id` to fetch the next page.
 
     Args:
+        limit (int): Maximum number of contacts to return (at most 500).
+        after_id (int, optional): Cursor; only contacts with a greater id
+            are returned.
         user (User): The current authenticated user.
         db (AsyncSession): Database session dependency.
 
     Returns:
-        list[ContactResponse]: A list of all contacts for the user.
+        list[ContactResponse]: One page of the user's contacts.
     """
     contact_repo = ContactRepository(db)
-    contacts = await contact_repo.get_all_contacts(user.id)
-    return contacts
+    contacts = await contact_repo.get_all_contacts(user.id, limit=limit, after_id=after_id)
+    # Return JSON-ready dicts (not a Response object) so the cache layer
+    # stores plain data; the app-wide ORJSONResponse handles the encoding.
+    return CONTACT_LIST_ADAPTER.dump_python(
+        CONTACT_LIST_ADAPTER.validate_python(contacts), mode="json"
+    )
 
 
 @router.get(
     "/all/",
-    response_model=list[ContactResponse],
     description='No more than 5 requests per 30 seconds',
     dependencies=[Depends(RateLimiter(times=5, seconds=30))],
     tags=["admin"],
 )
 async def get_contacts(
-    user: User = Depends(RoleChecker([RoleEnum.ADMIN])), 
-    db: AsyncSession = Depends(get_db)
+    user: User = Depends(RoleChecker([RoleEnum.ADMIN])),
 ):
     """
-    Admin-only route to retrieve all contacts in the system.
+    Admin-only route to stream all contacts in the system.
+
+    Rows come from a server-side cursor and are encoded one at a time
+    into a JSON array, so memory stays bounded and the first byte goes
+    out before the whole table has been read. The session is opened
+    inside the generator so it outlives the handler for the duration of
+    the stream.
 
     Args:
         user (User): The current authenticated admin user.
-        db (AsyncSession): Database session dependency.
 
     Returns:
-        list[ContactResponse]: A list of all contacts.
+        StreamingResponse: A JSON array with every contact.
     """
-    contact_repo = ContactRepository(db)
-    return await contact_repo.get_all_contacts(user.id)
+    async def generate():
+        async with SessionLocal() as session:
+            rows = await ContactRepository(session).iter_all_contacts()
+            yield b"["
+            first = True
+            async for row in rows:
+                if not first:
+                    yield b","
+                first = False
+                yield orjson.dumps(dict(row))
+            yield b"]"
+
+    return StreamingResponse(generate(), media_type="application/json")
 
 
 @router.put(
@@ -245,6 +427,7 @@ async def update_contact(
     contact = await contact_repo.update_contact(contact_id, contact_data, user.id)
     if not contact:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Contact not found")
+    await invalidate_contacts_cache(user.id)
     return contact
 
 
@@ -277,6 +460,7 @@ async def delete_contact(
     success = await contact_repo.delete_contact(contact_id, user.id)
     if not success:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Contact not found")
+    await invalidate_contacts_cache(user.id)
     return {"message": "Contact deleted successfully"}
 
 
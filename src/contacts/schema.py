@@ -14,7 +14,7 @@ class ContactResponse(Contact):
     id: int
 
     class Config:
-        from_atributes = True
+        from_attributes = True
 
 class ContactCreate(Contact):
     pass
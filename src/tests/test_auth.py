@@ -1,6 +1,3 @@
-from unittest.mock import patch
-
-from fastapi import BackgroundTasks
 import pytest
 from httpx import AsyncClient, ASGITransport
 from fastapi_limiter import FastAPILimiter
@@ -12,34 +9,39 @@ from main import app
 from src.auth.utils import get_gravatar_url
 
 
+# Every test here rebuilds the shared test database's tables, so all
+# DB-backed integration files run serially on one xdist worker.
+pytestmark = pytest.mark.xdist_group("integration-db")
+
 
 @pytest.mark.asyncio
 async def test_create_user(user_role: Role, override_get_db, faker):
     redis = aioredis.from_url(settings.redis_url, encoding="utf-8")
     await FastAPILimiter.init(redis)
-    with patch.object(BackgroundTasks, "add_task"):
-        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as ac:
-            email = faker.email()
-            username = faker.user_name()
-            password = faker.password()
-            avatar = get_gravatar_url(email)
-            payload = {
-                "email": email,
-                "username": username,
-                "password": password,
-                "avatar": avatar,
-            }
-            response = await ac.post(
-                "/auth/register",
-                json=payload,
-            )
-            assert response.status_code == 201
-            data = response.json()
-            assert data["email"] == payload["email"]
-            assert data["username"] == payload["username"]
-            assert data.get("password") is None
-            assert data["id"] is not None
-            assert data["avatar"] == payload["avatar"]
+    # The verification email is only enqueued on mail_queue; with no
+    # worker task running in tests nothing is sent over SMTP.
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as ac:
+        email = faker.email()
+        username = faker.user_name()
+        password = faker.password()
+        avatar = get_gravatar_url(email)
+        payload = {
+            "email": email,
+            "username": username,
+            "password": password,
+            "avatar": avatar,
+        }
+        response = await ac.post(
+            "/auth/register",
+            json=payload,
+        )
+        assert response.status_code == 201
+        data = response.json()
+        assert data["email"] == payload["email"]
+        assert data["username"] == payload["username"]
+        assert data.get("password") is None
+        assert data["id"] is not None
+        assert data["avatar"] == payload["avatar"]
 
 
 @pytest.mark.asyncio
@@ -5,6 +5,11 @@ from httpx import AsyncClient, ASGITransport
 from main import app
 
 
+# Every test here rebuilds the shared test database's tables, so all
+# DB-backed integration files run serially on one xdist worker.
+pytestmark = pytest.mark.xdist_group("integration-db")
+
+
 @pytest.mark.asyncio
 async def test_create_contact(auth_header, override_get_db, faker):
     async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as ac:
@@ -8,6 +8,7 @@ from src.auth.repos import UserRepository, RoleRepository
 from src.auth.schema import UserCreate
 from src.auth.models import User, Role
 from src.auth.schema import RoleEnum
+from src.auth.utils import get_gravatar_url
 
 
 
@@ -20,23 +21,26 @@ class TestUserRepository(unittest.IsolatedAsyncioTestCase):
 
 
     @patch("src.auth.repos.RoleRepository.get_role_by_name")
-    @patch("src.auth.repos.Gravatar")
-    async def test_create_user(self, MockGravatar, MockGetRoleByName):
-        mock_gravatar_instance = MockGravatar.return_value
-        mock_gravatar_instance.get_image.return_value = "https://example.com/default_avatar.png"
+    async def test_create_user(self, MockGetRoleByName):
         MockGetRoleByName.return_value = Role(id=1, name="user")
+        mock_result = MagicMock()
+        mock_result.scalar_one.return_value = 1
+        self.mock_session.execute.return_value = mock_result
         user_create = UserCreate(
-            username="testuser", 
-            password="testpassword", 
-            email="test@example.com", 
-            avatar="https://example.com/default_avatar.png"
+            username="testuser",
+            password="testpassword",
+            email="test@example.com",
+            avatar=get_gravatar_url("test@example.com")
         )
         new_user = await self.user_repo.create_user(user_create)
+        self.assertEqual(new_user.id, 1)
         self.assertEqual(new_user.username, "testuser")
         self.assertEqual(new_user.email, "test@example.com")
-        self.assertEqual(new_user.avatar, "https://example.com/default_avatar.png")
-        self.mock_session.add.assert_called_once_with(new_user)
+        self.assertEqual(new_user.avatar, get_gravatar_url("test@example.com"))
+        self.mock_session.execute.assert_called_once()
         self.mock_session.commit.assert_called_once()
+        query = self.mock_session.execute.call_args[0][0]
+        self.assertIn("INSERT INTO users", str(query))
 
 
     @patch("src.auth.repos.AsyncSession")
@@ -1,289 +1,281 @@
-import unittest
-from unittest.mock import AsyncMock, MagicMock
-from datetime import date
-from sqlalchemy.ext.asyncio import AsyncSession
-from src.contacts.models import Contact
-from src.contacts.schema import ContactCreate
-from src.contacts.repos import ContactRepository
-
-
-class TestContactRepository(unittest.IsolatedAsyncioTestCase):
-    def setUp(self):
-        self.mock_session = MagicMock(spec=AsyncSession)
-        self.contact_repo = ContactRepository(self.mock_session)
-
-    async def test_create_contact(self):
-        mock_owner_id = 1
-        mock_contact_data = ContactCreate(
-            first_name="John",
-            last_name="Doe",
-            email="john.doe@example.com",
-            phone_number="1234567890",
-            birthday=date(1990, 1, 1),
-            additional_info="info"
-        )
-        mock_contact = Contact(
-            id=1,
-            first_name=mock_contact_data.first_name,
-            last_name=mock_contact_data.last_name,
-            email=mock_contact_data.email,
-            phone_number=mock_contact_data.phone_number,
-            birthday=mock_contact_data.birthday,
-            owner_id=mock_owner_id,
-            additional_info=mock_contact_data.additional_info
-        )
-        self.mock_session.add = MagicMock()
-        self.mock_session.commit = AsyncMock()
-        self.mock_session.refresh = AsyncMock()
-        result = await self.contact_repo.create_contact(mock_contact_data, mock_owner_id)
-        added_contact = self.mock_session.add.call_args[0][0]
-        self.assertEqual(result.first_name, mock_contact.first_name)
-        self.assertEqual(result.last_name, mock_contact.last_name)
-        self.assertEqual(result.email, mock_contact.email)
-        self.assertEqual(result.phone_number, mock_contact.phone_number)
-        self.assertEqual(result.birthday, mock_contact.birthday)
-        self.assertEqual(result.owner_id, mock_contact.owner_id)
-        self.assertEqual(result.additional_info, mock_contact.additional_info)
-        self.mock_session.commit.assert_called_once()
-        self.mock_session.refresh.assert_called_once_with(added_contact)
-
-
-    async def test_get_contact(self):
-        mock_contact_id = 1
-        mock_owner_id = 10
-        mock_contact = Contact(
-            id=mock_contact_id,
-            owner_id=mock_owner_id,
-            first_name="John",
-            last_name="Doe",
-            email="john.doe@example.com",
-            phone_number="1234567890",
-            birthday=date(1990, 1, 1),
-            additional_info="info"
-        )
-        mock_result = MagicMock()
-        mock_result.scalar_one_or_none.return_value = mock_contact
-        self.mock_session.execute = AsyncMock(return_value=mock_result)
-        result = await self.contact_repo.get_contact(mock_contact_id, mock_owner_id)
-        self.assertEqual(result, mock_contact)
-        self.mock_session.execute.assert_called_once()
-        query = self.mock_session.execute.call_args[0][0]
-        self.assertIn("contact.id = :id_1", str(query))
-        self.assertIn("contact.owner_id = :owner_id_1", str(query))
-
-
-    async def test_get_all_contacts(self):
-        mock_owner_id = 10
-        mock_contacts = [
-            Contact(
-                id=1,
-                owner_id=mock_owner_id,
-                first_name="John",
-                last_name="Doe",
-                email="john.doe@example.com",
-                phone_number="1234567890",
-                birthday=date(1990, 1, 1),
-                additional_info="info"
-            )
-        ]
-        mock_result = MagicMock()
-        mock_scalars = MagicMock()
-        mock_scalars.all.return_value = mock_contacts
-        mock_result.scalars.return_value = mock_scalars
-        self.mock_session.execute.return_value = mock_result
-        result = await self.contact_repo.get_all_contacts(mock_owner_id)
-        self.assertEqual(result, mock_contacts)
-        self.mock_session.execute.assert_called_once()
-        query = self.mock_session.execute.call_args[0][0]
-        self.assertIn("contact.owner_id = :owner_id_1", str(query))
-
-
-    async def test_update_contact(self):
-        mock_contact_id = 1
-        mock_owner_id = 10
-        mock_contact_data = ContactCreate(
-            first_name="Jane",
-            last_name="Smith",
-            email="jane.smith@example.com",
-            phone_number="9876543210",
-            birthday=date(1992, 2, 2),
-            additional_info="updated info"
-        )
-        mock_contact = Contact(
-            id=mock_contact_id,
-            owner_id=mock_owner_id,
-            first_name="John",
-            last_name="Doe",
-            email="john.doe@example.com",
-            phone_number="1234567890",
-            birthday=date(1990, 1, 1),
-            additional_info="info"
-        )
-        mock_result = MagicMock()
-        mock_result.scalar_one_or_none.return_value = mock_contact
-        self.mock_session.execute.return_value = mock_result
-        updated_contact = await self.contact_repo.update_contact(
-            contact_id=mock_contact_id,
-            contact_data=mock_contact_data,
-            owner_id=mock_owner_id
-        )
-        self.mock_session.execute.assert_called_once()
-        self.mock_session.commit.assert_called_once()
-        self.mock_session.refresh.assert_called_once_with(mock_contact)
-        self.assertEqual(updated_contact.first_name, mock_contact_data.first_name)
-        self.assertEqual(updated_contact.last_name, mock_contact_data.last_name)
-        self.assertEqual(updated_contact.email, mock_contact_data.email)
-        self.assertEqual(updated_contact.phone_number, mock_contact_data.phone_number)
-        self.assertEqual(updated_contact.birthday, mock_contact_data.birthday)
-        self.assertEqual(updated_contact.additional_info, mock_contact_data.additional_info)
-        query = self.mock_session.execute.call_args[0][0]
-        self.assertIn("contact.id = :id_1", str(query))
-        self.assertIn("contact.owner_id = :owner_id_1", str(query))
-
-
-    async def test_delete_contact(self):
-        mock_contact_id = 1
-        mock_owner_id = 10
-        mock_contact = Contact(
-            id=mock_contact_id,
-            owner_id=mock_owner_id,
-            first_name="John",
-            last_name="Doe",
-            email="john.doe@example.com",
-            phone_number="1234567890",
-            birthday=date(1990, 1, 1),
-            additional_info="info"
-        )
-        self.contact_repo.get_contact = AsyncMock(return_value=mock_contact)
-        self.mock_session.delete = AsyncMock()
-        self.mock_session.commit = AsyncMock()
-        result = await self.contact_repo.delete_contact(
-            contact_id=mock_contact_id,
-            owner_id=mock_owner_id
-        )
-        self.mock_session.delete.assert_called_once_with(mock_contact)
-        self.mock_session.commit.assert_called_once()
-        self.assertTrue(result)
-
-
-    async def test_delete_contact_not_found(self):
-        mock_contact_id = 1
-        mock_owner_id = 10
-        self.contact_repo.get_contact = AsyncMock(return_value=None)
-        result = await self.contact_repo.delete_contact(
-            contact_id=mock_contact_id,
-            owner_id=mock_owner_id
-        )
-        self.mock_session.delete.assert_not_called()
-        self.mock_session.commit.assert_not_called()
-        self.assertFalse(result)
-
-
-    async def test_search_contacts_first_name(self):
-        mock_owner_id = 10
-        mock_first_name = "John"
-        mock_contact = Contact(
-            id=1,
-            owner_id=mock_owner_id,
-            first_name="John",
-            last_name="Doe",
-            email="john.doe@example.com",
-            phone_number="1234567890",
-            birthday=date(1990, 1, 1),
-            additional_info="info"
-        )
-        mock_result = MagicMock()
-        mock_result.scalars.return_value.all.return_value = [mock_contact]
-        self.mock_session.execute = AsyncMock(return_value=mock_result)
-        result = await self.contact_repo.search_contacts(
-            owner_id=mock_owner_id, 
-            first_name=mock_first_name
-        )
-        self.mock_session.execute.assert_called_once()
-        query = self.mock_session.execute.call_args[0][0]
-        self.assertIn("lower(contact.first_name) LIKE lower(:first_name_1)", str(query))
-        self.assertEqual(result, [mock_contact])
-
-
-    async def test_search_contacts_last_name(self):
-        mock_owner_id = 10
-        mock_last_name = "Doe"
-        mock_contact = Contact(
-            id=1,
-            owner_id=mock_owner_id,
-            first_name="John",
-            last_name="Doe",
-            email="john.doe@example.com",
-            phone_number="1234567890",
-            birthday=date(1990, 1, 1),
-            additional_info="info"
-        )
-        mock_result = MagicMock()
-        mock_result.scalars.return_value.all.return_value = [mock_contact]
-        self.mock_session.execute = AsyncMock(return_value=mock_result)
-        result = await self.contact_repo.search_contacts(
-            owner_id=mock_owner_id, 
-            last_name=mock_last_name
-        )
-        self.mock_session.execute.assert_called_once()
-        query = self.mock_session.execute.call_args[0][0]
-        self.assertIn("lower(contact.last_name) LIKE lower(:last_name_1)", str(query))
-        self.assertEqual(result, [mock_contact])
-
-    
-    async def test_search_contacts_email(self):
-        mock_owner_id = 10
-        mock_email = "john.doe@example.com"
-        mock_contact = Contact(
-            id=1,
-            owner_id=mock_owner_id,
-            first_name="John",
-            last_name="Doe",
-            email="john.doe@example.com",
-            phone_number="1234567890",
-            birthday=date(1990, 1, 1),
-            additional_info="info"
-        )
-        mock_result = MagicMock()
-        mock_result.scalars.return_value.all.return_value = [mock_contact]
-        self.mock_session.execute = AsyncMock(return_value=mock_result)
-        result = await self.contact_repo.search_contacts(
-            owner_id=mock_owner_id, 
-            email=mock_email
-        )
-        self.mock_session.execute.assert_called_once()
-        query = self.mock_session.execute.call_args[0][0]
-        self.assertIn("lower(contact.email) LIKE lower(:email_1)", str(query))
-        self.assertEqual(result, [mock_contact])
-
-
-    async def test_search_contacts_multiple_filters(self):
-        mock_owner_id = 10
-        mock_first_name = "John"
-        mock_last_name = "Doe"
-        mock_email = "john.doe@example.com"
-        mock_contact = Contact(
-            id=1,
-            owner_id=mock_owner_id,
-            first_name="John",
-            last_name="Doe",
-            email="john.doe@example.com",
-            phone_number="1234567890",
-            birthday=date(1990, 1, 1),
-            additional_info="info"
-        )
-        mock_result = MagicMock()
-        mock_result.scalars.return_value.all.return_value = [mock_contact]
-        self.mock_session.execute = AsyncMock(return_value=mock_result)
-        result = await self.contact_repo.search_contacts(
-            owner_id=mock_owner_id, 
-            first_name=mock_first_name, 
-            last_name=mock_last_name,
-            email=mock_email
-        )
-        self.mock_session.execute.assert_called_once()
-        query = self.mock_session.execute.call_args[0][0]
-        self.assertIn("lower(contact.first_name) LIKE lower(:first_name_1)", str(query))
-        self.assertIn("lower(contact.last_name) LIKE lower(:last_name_1)", str(query))
-        self.assertIn("lower(contact.email) LIKE lower(:email_1)", str(query))
-        self.assertEqual(result, [mock_contact])
\ No newline at end of file
+import copy
+import re
+
+import pytest
+from unittest.mock import AsyncMock, create_autospec
+from datetime import date
+from sqlalchemy.ext.asyncio import AsyncSession
+from src.contacts.models import Contact
+from src.contacts.schema import ContactCreate
+from src.contacts.repos import ContactRepository
+
+# One event loop for the whole module instead of a fresh loop per test,
+# which is where IsolatedAsyncioTestCase spent most of its fixed cost.
+pytestmark = pytest.mark.asyncio(loop_scope="module")
+
+# Specced once at import: building the spec walks AsyncSession's whole
+# attribute surface, which is too expensive to repeat in every test. Each
+# test receives a shallow copy with the methods it touches re-attached
+# fresh, so no call state leaks between tests.
+_SESSION_TEMPLATE = create_autospec(AsyncSession, instance=True)
+
+# One AsyncMock per session method for the whole module: constructing an
+# AsyncMock builds its child-mock graph and async side effects each time,
+# so the fixture re-uses these and only resets call state between tests.
+_SESSION_METHOD_MOCKS = {
+    name: AsyncMock() for name in ("execute", "commit", "refresh", "delete", "stream")
+}
+
+# Compiled once: the search tests assert which ilike filters made it into
+# the rendered SQL, and one regex scan extracts all of them in a single
+# pass instead of a substring check per filter.
+_SEARCH_FILTER_RE = re.compile(r"lower\(contact\.(\w+)\) LIKE lower\(:\w+_1\)")
+
+# Expected filter sets built once at import; the search tests index this
+# table instead of allocating a fresh set literal per run.
+_EXPECTED_FILTERS = {
+    "first_name": {"first_name"},
+    "last_name": {"last_name"},
+    "email": {"email"},
+    "all": {"first_name", "last_name", "email"},
+}
+
+# Shared fixture objects, validated/instrumented once at import instead of
+# per test. Tests only read their attributes, so no copies are needed.
+_OWNER_ID = 10
+_CONTACT_CREATE = ContactCreate(
+    first_name="John",
+    last_name="Doe",
+    email="john.doe@example.com",
+    phone_number="1234567890",
+    birthday=date(1990, 1, 1),
+    additional_info="info"
+)
+_UPDATED_CONTACT_CREATE = ContactCreate(
+    first_name="Jane",
+    last_name="Smith",
+    email="jane.smith@example.com",
+    phone_number="9876543210",
+    birthday=date(1992, 2, 2),
+    additional_info="updated info"
+)
+_CONTACT = Contact(id=1, owner_id=_OWNER_ID, **_CONTACT_CREATE.model_dump())
+_UPDATED_CONTACT = Contact(id=1, owner_id=_OWNER_ID, **_UPDATED_CONTACT_CREATE.model_dump())
+
+class _Result:
+    """
+    Narrow stand-in for a SQLAlchemy result.
+
+    MagicMock chains like `scalars.return_value.all.return_value` allocate
+    a child mock per attribute hop; this class covers exactly the result
+    surface the repository touches (scalar accessors, scalars/mappings
+    with `.all()`, and async iteration for the streamed paths) with plain
+    attribute access.
+    """
+
+    def __init__(self, rows):
+        self._rows = rows
+
+    def scalars(self):
+        return self
+
+    def mappings(self):
+        return self
+
+    def all(self):
+        return self._rows
+
+    def scalar_one(self):
+        return self._rows[0]
+
+    def scalar_one_or_none(self):
+        return self._rows[0] if self._rows else None
+
+    def __aiter__(self):
+        self._iter = iter(self._rows)
+        return self
+
+    async def __anext__(self):
+        try:
+            return next(self._iter)
+        except StopIteration:
+            raise StopAsyncIteration
+
+
+# The delete tests only read the returned id off the result, so one
+# shared instance with its rows swapped per test serves both cases.
+_DELETE_RESULT = _Result([])
+
+# One repository for the whole module; __init__ only stores the session,
+# so the fixture swaps that attribute instead of constructing a new
+# instance per test.
+_REPO = ContactRepository.__new__(ContactRepository)
+
+
+@pytest.fixture
+def mock_session():
+    session = copy.copy(_SESSION_TEMPLATE)
+    for name, method in _SESSION_METHOD_MOCKS.items():
+        method.reset_mock(return_value=True, side_effect=True)
+        setattr(session, name, method)
+    return session
+
+
+@pytest.fixture
+def contact_repo(mock_session):
+    _REPO.session = mock_session
+    return _REPO
+
+
+async def test_create_contact(contact_repo, mock_session):
+    mock_session.execute.return_value = _Result([_CONTACT])
+    result = await contact_repo.create_contact(_CONTACT_CREATE, _OWNER_ID)
+    assert result.first_name == _CONTACT.first_name
+    assert result.last_name == _CONTACT.last_name
+    assert result.email == _CONTACT.email
+    assert result.phone_number == _CONTACT.phone_number
+    assert result.birthday == _CONTACT.birthday
+    assert result.owner_id == _CONTACT.owner_id
+    assert result.additional_info == _CONTACT.additional_info
+    mock_session.execute.assert_called_once()
+    mock_session.commit.assert_called_once()
+    mock_session.refresh.assert_not_called()
+    rendered = str(mock_session.execute.call_args[0][0])
+    assert "INSERT INTO contact" in rendered
+
+
+async def test_create_contacts_bulk(contact_repo, mock_session):
+    mock_contact_data = [_CONTACT_CREATE, _UPDATED_CONTACT_CREATE]
+    mock_contacts = [_CONTACT, _UPDATED_CONTACT]
+    mock_session.execute.return_value = _Result(mock_contacts)
+    result = await contact_repo.create_contacts_bulk(mock_contact_data, _OWNER_ID)
+    assert result == mock_contacts
+    mock_session.execute.assert_called_once()
+    mock_session.commit.assert_called_once()
+    rendered = str(mock_session.execute.call_args[0][0])
+    assert "INSERT INTO contact" in rendered
+
+
+async def test_get_contact(contact_repo, mock_session):
+    mock_session.execute.return_value = _Result([_CONTACT])
+    result = await contact_repo.get_contact(_CONTACT.id, _OWNER_ID)
+    assert result == _CONTACT
+    mock_session.execute.assert_called_once()
+    query, params = mock_session.execute.call_args[0]
+    # str() on a Select compiles the statement each time; render once and
+    # assert against the cached string.
+    rendered = str(query)
+    assert "contact.id = :contact_id" in rendered
+    assert "contact.owner_id = :owner_id" in rendered
+    assert params == {"contact_id": _CONTACT.id, "owner_id": _OWNER_ID}
+
+
+async def test_get_all_contacts(contact_repo, mock_session):
+    mock_session.stream.return_value = _Result([_CONTACT])
+    result = await contact_repo.get_all_contacts(_OWNER_ID)
+    assert result == [_CONTACT]
+    mock_session.stream.assert_called_once()
+    rendered = str(mock_session.stream.call_args[0][0])
+    assert "contact.owner_id = :owner_id_1" in rendered
+    assert "ORDER BY contact.id" in rendered
+    assert "LIMIT :param_1" in rendered
+
+
+async def test_update_contact(contact_repo, mock_session):
+    mock_session.execute.return_value = _Result([_UPDATED_CONTACT])
+    updated_contact = await contact_repo.update_contact(
+        contact_id=_UPDATED_CONTACT.id,
+        contact_data=_UPDATED_CONTACT_CREATE,
+        owner_id=_OWNER_ID
+    )
+    mock_session.execute.assert_called_once()
+    mock_session.commit.assert_called_once()
+    mock_session.refresh.assert_not_called()
+    assert updated_contact.first_name == _UPDATED_CONTACT_CREATE.first_name
+    assert updated_contact.last_name == _UPDATED_CONTACT_CREATE.last_name
+    assert updated_contact.email == _UPDATED_CONTACT_CREATE.email
+    assert updated_contact.phone_number == _UPDATED_CONTACT_CREATE.phone_number
+    assert updated_contact.birthday == _UPDATED_CONTACT_CREATE.birthday
+    assert updated_contact.additional_info == _UPDATED_CONTACT_CREATE.additional_info
+    rendered = str(mock_session.execute.call_args[0][0])
+    assert "UPDATE contact" in rendered
+    assert "contact.id = :id_1" in rendered
+    assert "contact.owner_id = :owner_id_1" in rendered
+
+
+async def test_delete_contact(contact_repo, mock_session):
+    _DELETE_RESULT._rows = [_CONTACT.id]
+    mock_session.execute.return_value = _DELETE_RESULT
+    result = await contact_repo.delete_contact(
+        contact_id=_CONTACT.id,
+        owner_id=_OWNER_ID
+    )
+    mock_session.execute.assert_called_once()
+    mock_session.commit.assert_called_once()
+    rendered = str(mock_session.execute.call_args[0][0])
+    assert "DELETE FROM contact" in rendered
+    assert "contact.id = :id_1" in rendered
+    assert "contact.owner_id = :owner_id_1" in rendered
+    assert "RETURNING contact.id" in rendered
+    assert result is True
+
+
+async def test_delete_contact_not_found(contact_repo, mock_session):
+    _DELETE_RESULT._rows = []
+    mock_session.execute.return_value = _DELETE_RESULT
+    result = await contact_repo.delete_contact(
+        contact_id=_CONTACT.id,
+        owner_id=_OWNER_ID
+    )
+    mock_session.execute.assert_called_once()
+    assert result is False
+
+
+async def test_search_contacts_first_name(contact_repo, mock_session):
+    mock_session.execute.return_value = _Result([_CONTACT])
+    result = await contact_repo.search_contacts(
+        owner_id=_OWNER_ID,
+        first_name=_CONTACT.first_name
+    )
+    mock_session.execute.assert_called_once()
+    rendered = str(mock_session.execute.call_args[0][0])
+    assert set(_SEARCH_FILTER_RE.findall(rendered)) == _EXPECTED_FILTERS["first_name"]
+    assert result == [_CONTACT]
+
+
+async def test_search_contacts_last_name(contact_repo, mock_session):
+    mock_session.execute.return_value = _Result([_CONTACT])
+    result = await contact_repo.search_contacts(
+        owner_id=_OWNER_ID,
+        last_name=_CONTACT.last_name
+    )
+    mock_session.execute.assert_called_once()
+    rendered = str(mock_session.execute.call_args[0][0])
+    assert set(_SEARCH_FILTER_RE.findall(rendered)) == _EXPECTED_FILTERS["last_name"]
+    assert result == [_CONTACT]
+
+
+async def test_search_contacts_email(contact_repo, mock_session):
+    mock_session.execute.return_value = _Result([_CONTACT])
+    result = await contact_repo.search_contacts(
+        owner_id=_OWNER_ID,
+        email=_CONTACT.email
+    )
+    mock_session.execute.assert_called_once()
+    rendered = str(mock_session.execute.call_args[0][0])
+    assert set(_SEARCH_FILTER_RE.findall(rendered)) == _EXPECTED_FILTERS["email"]
+    assert result == [_CONTACT]
+
+
+async def test_search_contacts_multiple_filters(contact_repo, mock_session):
+    mock_session.execute.return_value = _Result([_CONTACT])
+    result = await contact_repo.search_contacts(
+        owner_id=_OWNER_ID,
+        first_name=_CONTACT.first_name,
+        last_name=_CONTACT.last_name,
+        email=_CONTACT.email
+    )
+    mock_session.execute.assert_called_once()
+    rendered = str(mock_session.execute.call_args[0][0])
+    assert set(_SEARCH_FILTER_RE.findall(rendered)) == _EXPECTED_FILTERS["all"]
+    assert result == [_CONTACT]
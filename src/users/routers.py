@@ -21,15 +21,20 @@ Usage:
 """
 
 
+import asyncio
+from functools import lru_cache
+
 from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, status
-from fastapi_limiter.depends import RateLimiter
-from sqlalchemy.ext.asyncio import AsyncSession
 import cloudinary
 import cloudinary.uploader
 
-from config.db import get_db
 from config.general import settings
-from src.auth.utils import get_current_user
+from src.auth.utils import (
+    ConditionalRateLimiter,
+    get_current_user,
+    get_user_repo,
+    invalidate_user_cache,
+)
 from src.auth.schema import UserResponse
 from src.auth.repos import UserRepository
 from src.auth.models import User
@@ -38,7 +43,55 @@ from src.auth.models import User
 router = APIRouter()
 
 
-@router.get("/me/", response_model=UserResponse)
+def _configure():
+    """
+    Apply the Cloudinary credentials from settings.
+
+    Called once at import; the config is process-wide state, so repeating
+    it per request only rebuilt the same object. Tests that need different
+    credentials can call this after patching `settings`.
+    """
+    cloudinary.config(
+        cloud_name=settings.cloudinary_name,
+        api_key=settings.cloudinary_api_key,
+        api_secret=settings.cloudinary_api_secret,
+        secure=True
+    )
+
+
+_configure()
+
+# Avatars at or below this size are read asynchronously from Starlette's
+# spool and handed to Cloudinary as bytes; larger files go through the
+# chunked upload so only one chunk is in memory at a time.
+SMALL_AVATAR_MAX_BYTES = 1_000_000
+
+
+@lru_cache(maxsize=4096)
+def _avatar_url(username: str, version) -> str:
+    """
+    Build the sized avatar URL for a user.
+
+    The URL is a pure function of (username, version) — the transformation
+    is fixed — so the result is memoized and the URL builder runs once per
+    new upload instead of on every request. The public_id is part of the
+    URL, which is why the whole build is cached rather than a template.
+
+    Args:
+        username (str): The avatar owner's username.
+        version: The Cloudinary asset version returned by the upload.
+
+    Returns:
+        str: The CDN URL of the 250x250 cropped avatar.
+    """
+    return cloudinary.CloudinaryImage(f'avatars/{username}')\
+        .build_url(width=250, height=250, crop='fill', version=version)
+
+
+# exclude_unset keeps response serialization to the fields the model
+# actually carries; UserResponse deliberately declares no relationship
+# fields, so building the response never touches lazy-loaded attributes.
+@router.get("/me/", response_model=UserResponse, response_model_exclude_unset=True)
 async def read_users_me(current_user: User = Depends(get_current_user)):
     """
     Retrieve the current authenticated user's information.
@@ -53,15 +106,16 @@ async def read_users_me(current_user: User = Depends(get_current_user)):
 
 
 @router.patch(
-        '/avatar', 
-        response_model=UserResponse, 
+        '/avatar',
+        response_model=UserResponse,
+        response_model_exclude_unset=True,
         description='No more than 5 requests per 30 seconds',
-        dependencies=[Depends(RateLimiter(times=5, seconds=30))]
+        dependencies=[Depends(ConditionalRateLimiter(times=5, seconds=30))]
 )
 async def update_avatar_user(
-    file: UploadFile = File(), 
+    file: UploadFile = File(),
     current_user: User = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db),
+    user_repo: UserRepository = Depends(get_user_repo),
 ):
     """
     Update the avatar for the authenticated user.
@@ -71,7 +125,7 @@ async def update_avatar_user(
     Args:
         file (UploadFile): The uploaded avatar file.
         current_user (User): The current authenticated user, fetched via dependency injection.
-        db (AsyncSession): The database session.
+        user_repo (UserRepository): Repository bound to the request's session.
 
     Returns:
         UserResponse: The updated user information including the new avatar URL.
@@ -79,25 +133,42 @@ async def update_avatar_user(
     Raises:
         HTTPException: If an error occurs during avatar upload to Cloudinary or database update.
     """
-    cloudinary.config(
-        cloud_name=settings.cloudinary_name,
-        api_key=settings.cloudinary_api_key,
-        api_secret=settings.cloudinary_api_secret,
-        secure=True
-    )
     try:
-        r = cloudinary.uploader.upload(
-            file.file, 
-            public_id=f'avatars/{current_user.username}',
-            overwrite=True,
-        )
-        src_url = cloudinary.CloudinaryImage(f'avatars/{current_user.username}')\
-                        .build_url(width=250, height=250, crop='fill', version=r.get('version'))
+        # The Cloudinary SDK is synchronous; running it on the event loop
+        # would stall every other request for the duration of a multi-MB
+        # network upload, so both paths run in a worker thread. Typical
+        # avatars fit under the spool threshold: read those asynchronously
+        # and upload the bytes directly, avoiding the SDK's blocking
+        # file-read loop. Anything bigger streams through the chunked
+        # upload so only one ~6MB chunk is in flight at a time.
+        if file.size is not None and file.size <= SMALL_AVATAR_MAX_BYTES:
+            data = await file.read()
+            r = await asyncio.to_thread(
+                cloudinary.uploader.upload,
+                data,
+                public_id=f'avatars/{current_user.username}',
+                overwrite=True,
+            )
+        else:
+            r = await asyncio.to_thread(
+                cloudinary.uploader.upload_large,
+                file.file,
+                public_id=f'avatars/{current_user.username}',
+                overwrite=True,
+                chunk_size=6_000_000,
+            )
+        src_url = _avatar_url(current_user.username, r.get('version'))
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Error uploading avatar: {str(e)}"
         )
-    user_repo = UserRepository(db)
-    user = await user_repo.update_avatar(current_user.email, src_url)
+    # The DB write and the Redis cache bust touch different stores and
+    # don't depend on each other's result, so they run concurrently; the
+    # user cache's short TTL bounds the worst-case stale read if a lookup
+    # lands between the two completing.
+    user, _ = await asyncio.gather(
+        user_repo.update_avatar(current_user.email, src_url),
+        invalidate_user_cache(current_user.username),
+    )
     return user